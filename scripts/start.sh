@@ -52,10 +52,16 @@ for PORT in {5173..5179}; do
     fi
 done
 
-# Start backend server
+# Start backend server (gunicorn with gevent workers; falls back to the
+# Flask dev server if gunicorn is not installed)
 echo -e "${GREEN}Starting backend server...${NC}"
 cd "$BACKEND_DIR"
-python api.py > "${LOGS_DIR}/backend.log" 2>&1 &
+if command -v gunicorn >/dev/null 2>&1; then
+    gunicorn -c gunicorn_conf.py 'api:create_app()' > "${LOGS_DIR}/backend.log" 2>&1 &
+else
+    echo -e "${YELLOW}gunicorn not found, falling back to the Flask dev server${NC}"
+    python api.py > "${LOGS_DIR}/backend.log" 2>&1 &
+fi
 BACKEND_PID=$!
 
 # Check if backend started successfully
@@ -8,27 +8,65 @@ import os
 import sys
 import json
 import time
+import fcntl
+import hashlib
 import logging
-from datetime import datetime
-from flask import Flask, jsonify, request, Blueprint, send_from_directory
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from flask import Flask, Response, request, Blueprint, send_file, send_from_directory
 from flask_cors import CORS
 
+# Use orjson for status serialization when available (much faster than stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Binary status sibling for backend consumers; optional, JSON stays canonical
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+def _dump_bytes(obj):
+    """Serialize an object to indented JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+def _json_response(payload, status=200):
+    """Build a JSON response directly with orjson, bypassing jsonify"""
+    if orjson is not None:
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        body = json.dumps(payload).encode('utf-8')
+    return Response(body, status=status, mimetype='application/json')
+
 # Add parent directory to path for imports
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 sys.path.append(parent_dir)
 
-from src.backend.strategies.paper_trading import PaperTradingStrategy
+from src.backend.strategies.paper_trading import PaperTradingStrategy, now_iso
 
 # Configure logging
 log_dir = os.path.join(parent_dir, 'logs')
 os.makedirs(log_dir, exist_ok=True)
 log_file = os.path.join(log_dir, 'paper_trading_api.log')
 
+# File writes happen on a background listener thread, so request handlers
+# only pay for a queue put instead of a locked disk write per log call
+_log_queue = queue.SimpleQueue()
+_file_handler = logging.FileHandler(log_file)
+_file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = QueueListener(_log_queue, _file_handler, respect_handler_level=True)
+_log_listener.start()
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler(log_file),
+        QueueHandler(_log_queue),
         logging.StreamHandler()
     ]
 )
@@ -54,100 +92,234 @@ strategy = PaperTradingStrategy(config_file=config_file)
 
 # Initialize strategy instance
 trading_thread = None
-last_status_update = None
+last_status_update = 0.0
+
+# Track what was last written to the status file so unchanged state is not
+# re-serialized, and so pollers can revalidate with an ETag
+_last_written_version = None
+_last_written_time = 0.0
+_status_etag = None
 
 # Path for storing the status JSON
 data_dir = os.path.join(parent_dir, 'data')
 os.makedirs(data_dir, exist_ok=True)
 status_file = os.path.join(data_dir, 'paper_trading_status.json')
+status_lock_file = status_file + '.lock'
+
+# Binary variant of the status document, read by backend consumers that have
+# no use for JSON encode/decode; the HTTP endpoints keep serving JSON
+status_msgpack_file = os.path.join(data_dir, 'paper_trading_status.msgpack')
+
+# Whether this process has written the status file yet; checked in memory so
+# the GET hot path avoids a stat() syscall per request
+_status_file_written = os.path.exists(status_file)
+
+def _build_status():
+    """Build the full status document for the frontend"""
+    # Refresh all prices with one batched API call, then value the holdings
+    strategy.refresh_all_tickers()
+    total_value = strategy.balance
+    holdings_with_value = {}
+    if strategy.client:
+        # The batched refresh just filled the cache; no per-symbol calls
+        prices = strategy.last_prices
+    else:
+        # Simulated path: fan the per-symbol lookups through the pool
+        prices = strategy.fetch_prices(strategy.holdings.keys())
+
+    for symbol, amount in strategy.holdings.items():
+        # Fall back to the per-symbol lookup (a cached dict read) for
+        # holdings bought since the last published refresh
+        price = prices.get(symbol) or strategy.get_current_price(symbol)
+        if price:
+            value = amount * price
+            total_value += value
+            holdings_with_value[symbol] = amount
+
+    # Trade entries are already stored in their wire shape and the deque
+    # holds exactly the last N, so no slicing or per-trade rebuild is needed
+    trade_history = list(strategy.trade_history)
+
+    return {
+        'is_running': strategy.is_running,
+        'mode': strategy.mode,
+        'balance': strategy.balance,
+        'holdings': holdings_with_value,
+        'base_currency': strategy.base_currency,
+        'portfolio_value': total_value,
+        'performance': {
+            'total_trades': strategy._total_trades,
+            'win_rate': strategy.calculate_win_rate(),
+            'profit_loss': strategy.calculate_profit_loss(),
+            'return_pct': (strategy.calculate_profit_loss() / strategy.initial_balance) * 100 if strategy.initial_balance > 0 else 0,
+            'sharpe_ratio': strategy.calculate_sharpe_ratio(),
+            'max_drawdown': strategy.calculate_max_drawdown()
+        },
+        'trade_history': trade_history,
+        'last_prices': strategy.last_prices,
+        'last_updated': now_iso(),
+        'api_keys_configured': strategy._api_keys_configured
+    }
+
+# Pre-serialized fragment of status fields that only change when the config
+# or API keys do, cached as (state key, bytes with the outer braces stripped)
+_static_fragment = (None, b'')
+
+# Status keys covered by the pre-serialized fragment
+_STATIC_STATUS_KEYS = ('mode', 'base_currency', 'api_keys_configured')
+
+def _static_status_fragment():
+    """Return the immutable status fields serialized once per config change"""
+    global _static_fragment
+
+    key = (strategy.mode, strategy.base_currency, strategy._api_keys_configured)
+    if _static_fragment[0] != key:
+        buf = _dump_bytes({
+            'mode': strategy.mode,
+            'base_currency': strategy.base_currency,
+            'api_keys_configured': strategy._api_keys_configured
+        })
+        _static_fragment = (key, buf[1:-1])
+    return _static_fragment[1]
 
 def update_status_file():
     """Update the status JSON file for the frontend"""
-    global last_status_update
-    
+    global last_status_update, _last_written_version, _last_written_time, _status_etag, _status_file_written
+
     try:
-        # Calculate total portfolio value
-        total_value = strategy.balance
-        holdings_with_value = {}
-        
-        for symbol, amount in strategy.holdings.items():
-            price = strategy.get_current_price(symbol)
-            if price:
-                value = amount * price
-                total_value += value
-                holdings_with_value[symbol] = amount
-        
-        # Prepare trade history entries for the status file
-        trade_history = []
-        for trade in strategy.trade_history[-strategy.config.get('max_history_items', 100):]:
-            trade_history.append({
-                'timestamp': trade['timestamp'],
-                'symbol': trade['symbol'],
-                'side': trade['side'],
-                'quantity': trade['quantity'],
-                'price': trade['price'],
-                'value': trade['value'],
-                'balance_after': trade['balance_after'],
-                'type': trade.get('type', 'market')
-            })
-        
-        # Create the status object
-        status = {
-            'is_running': strategy.is_running,
-            'mode': strategy.config.get('mode', 'paper'),
-            'balance': strategy.balance,
-            'holdings': holdings_with_value,
-            'base_currency': strategy.config.get('base_currency', 'USDT'),
-            'portfolio_value': total_value,
-            'performance': {
-                'total_trades': len(strategy.trade_history),
-                'win_rate': strategy.calculate_win_rate(),
-                'profit_loss': strategy.calculate_profit_loss(),
-                'return_pct': (strategy.calculate_profit_loss() / strategy.initial_balance) * 100 if strategy.initial_balance > 0 else 0,
-                'sharpe_ratio': strategy.calculate_sharpe_ratio(),
-                'max_drawdown': strategy.calculate_max_drawdown()
-            },
-            'trade_history': trade_history,
-            'last_prices': strategy.last_prices,
-            'last_updated': datetime.now().isoformat(),
-            'api_keys_configured': bool(strategy.config.get('api_key')) and bool(strategy.config.get('api_secret'))
-        }
-        
-        # Write to the status file
-        with open(status_file, 'w') as f:
-            json.dump(status, f, indent=2)
-            
-        last_status_update = time.time()
-        logger.debug(f'Updated status file: {status_file}')
+        # Skip the rebuild entirely when the strategy state has not changed
+        # since the last write and prices are still within the refresh window
+        version = strategy._state_version
+        if version == _last_written_version and time.monotonic() - _last_written_time < 5:
+            return
+
+        status = _build_status()
+
+        # Pack the binary sibling from the full document before the static
+        # keys are stripped for the JSON splice below
+        msgpack_buf = msgpack.packb(status, use_bin_type=True) if msgpack is not None else None
+
+        # Splice the pre-serialized immutable fields with the mutable rest so
+        # the serializer only works on what actually changes between writes
+        for key in _STATIC_STATUS_KEYS:
+            status.pop(key, None)
+        mutable = _dump_bytes(status)
+        buf = b'{' + _static_status_fragment() + b',' + mutable[1:-1] + b'}'
+
+        # Write to a temp file and rename it into place under an exclusive
+        # lock, so readers never see a truncated file and concurrent gunicorn
+        # workers do not interleave writes
+        tmp_file = f'{status_file}.tmp.{os.getpid()}'
+        with open(status_lock_file, 'w') as lock_f:
+            fcntl.flock(lock_f, fcntl.LOCK_EX)
+            try:
+                with open(tmp_file, 'wb') as f:
+                    f.write(buf)
+                os.replace(tmp_file, status_file)
+
+                if msgpack_buf is not None:
+                    tmp_msgpack = f'{status_msgpack_file}.tmp.{os.getpid()}'
+                    with open(tmp_msgpack, 'wb') as f:
+                        f.write(msgpack_buf)
+                    os.replace(tmp_msgpack, status_msgpack_file)
+            finally:
+                fcntl.flock(lock_f, fcntl.LOCK_UN)
+
+        _status_etag = hashlib.blake2b(buf, digest_size=16).hexdigest()
+        _last_written_version = version
+        _last_written_time = time.monotonic()
+        last_status_update = _last_written_time
+        _status_file_written = True
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'Updated status file: {status_file}')
         
     except Exception as e:
         logger.error(f'Error updating status file: {e}')
 
+# Latest status serialized for SSE subscribers, shared so the document is
+# built once per state version no matter how many clients are connected
+_sse_lock = threading.Lock()
+_sse_cache = (None, None)
+
+def _status_event_payload():
+    """Serialize the current status once per state version for all subscribers"""
+    global _sse_cache
+
+    version = strategy._state_version
+    with _sse_lock:
+        if _sse_cache[0] != version:
+            status = _build_status()
+            if orjson is not None:
+                # Compact output: SSE data must stay on a single line
+                buf = orjson.dumps(status, option=orjson.OPT_SERIALIZE_NUMPY)
+            else:
+                buf = json.dumps(status).encode('utf-8')
+            _sse_cache = (version, buf)
+        return _sse_cache[1]
+
+def _status_event_stream():
+    """Yield a Server-Sent Event whenever the strategy state changes"""
+    last_sent = None
+    while True:
+        version = strategy._state_version
+        if version != last_sent:
+            payload = _status_event_payload()
+            last_sent = version
+            yield b'data: ' + payload + b'\n\n'
+        else:
+            # Heartbeat comment while idle: the write to a closed socket
+            # fails, so disconnected clients' generators get collected
+            # instead of waiting forever
+            yield b': keep-alive\n\n'
+
+        # Sleep until the next state change (or the heartbeat interval)
+        with strategy._state_changed:
+            strategy._state_changed.wait(timeout=5)
+
+@paper_trading_bp.route('/paper/stream', methods=['GET'])
+def stream_status():
+    """Push status updates over Server-Sent Events instead of being polled"""
+    response = Response(_status_event_stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @paper_trading_bp.route('/paper', methods=['GET'])
 def get_status():
     """Get the current paper trading status"""
     try:
         # Update the status file if it doesn't exist or is older than 5 seconds
-        if not os.path.exists(status_file) or last_status_update is None or time.time() - last_status_update > 5:
+        # In-memory flag instead of a stat() syscall per poll
+        if not _status_file_written or time.monotonic() - last_status_update > 5:
             update_status_file()
-        
+
+        # Let pollers reuse their cached copy when nothing has changed;
+        # werkzeug's if_none_match handles the quoting of the echoed ETag
+        if _status_etag and request.if_none_match.contains(_status_etag):
+            response = Response(status=304)
+            response.set_etag(_status_etag)
+            return response
+
         # Return a simplified status for faster response
-        return jsonify({
+        response = _json_response({
             'status': 'success',
             'data': {
                 'is_running': strategy.is_running,
-                'mode': strategy.config.get('mode', 'paper'),
+                'mode': strategy.mode,
                 'balance': strategy.balance,
                 'portfolio_value': strategy.calculate_portfolio_value(),
-                'last_updated': datetime.now().isoformat()
+                'last_updated': now_iso()
             }
         })
+        if _status_etag:
+            response.set_etag(_status_etag)
+        return response
     except Exception as e:
         logger.error(f'Error getting status: {e}')
-        return jsonify({
+        return _json_response({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }, 500)
 
 @paper_trading_bp.route('/paper', methods=['POST'])
 def handle_command():
@@ -157,60 +329,61 @@ def handle_command():
     try:
         data = request.json
         if not data:
-            return jsonify({
+            return _json_response({
                 'status': 'error',
                 'message': 'No JSON data provided'
-            }), 400
+            }, 400)
         
         command = data.get('command')
         if not command:
-            return jsonify({
+            return _json_response({
                 'status': 'error',
                 'message': 'No command specified'
-            }), 400
+            }, 400)
         
         logger.info(f'Received command: {command}')
         
         if command == 'start':
             if strategy.is_running:
-                return jsonify({
+                return _json_response({
                     'status': 'success',
                     'message': 'Trading already running'
                 })
             
             # Check for API keys
             if not strategy.api_keys_configured():
-                # Try to recover keys if possible
-                if not attempt_to_recover_api_keys():
-                    return jsonify({
+                # Recovery already ran once at module import; don't re-read
+                # env vars and the backup file on every start attempt
+                if strategy._recovery_attempted or not attempt_to_recover_api_keys():
+                    return _json_response({
                         'status': 'error',
                         'message': 'API keys not configured'
-                    }), 400
+                    }, 400)
             
             # Start the trading thread
             if trading_thread is None or not trading_thread.is_alive():
                 strategy.start()
                 update_status_file()
-                return jsonify({
+                return _json_response({
                     'status': 'success',
                     'message': 'Trading started'
                 })
             else:
-                return jsonify({
+                return _json_response({
                     'status': 'error',
                     'message': 'Trading thread already running'
-                }), 400
+                }, 400)
                 
         elif command == 'stop':
             if not strategy.is_running:
-                return jsonify({
+                return _json_response({
                     'status': 'success',
                     'message': 'Trading already stopped'
                 })
             
             strategy.stop()
             update_status_file()
-            return jsonify({
+            return _json_response({
                 'status': 'success',
                 'message': 'Trading stopped'
             })
@@ -219,7 +392,7 @@ def handle_command():
             strategy.stop()
             strategy.reset_account()
             update_status_file()
-            return jsonify({
+            return _json_response({
                 'status': 'success',
                 'message': 'Account reset'
             })
@@ -229,48 +402,48 @@ def handle_command():
             quantity = float(data.get('quantity', 0.001))
             
             if not strategy.is_running:
-                return jsonify({
+                return _json_response({
                     'status': 'error',
                     'message': 'Trading is not running'
-                }), 400
+                }, 400)
             
             success, message = strategy.place_buy_order(symbol, quantity)
             update_status_file()
             
             if success:
-                return jsonify({
+                return _json_response({
                     'status': 'success',
                     'message': message
                 })
             else:
-                return jsonify({
+                return _json_response({
                     'status': 'error',
                     'message': message
-                }), 400
+                }, 400)
                 
         elif command == 'sell':
             symbol = data.get('symbol', 'BTCUSDT')
             quantity = float(data.get('quantity', 0.001))
             
             if not strategy.is_running:
-                return jsonify({
+                return _json_response({
                     'status': 'error',
                     'message': 'Trading is not running'
-                }), 400
+                }, 400)
                 
             success, message = strategy.place_sell_order(symbol, quantity)
             update_status_file()
             
             if success:
-                return jsonify({
+                return _json_response({
                     'status': 'success',
                     'message': message
                 })
             else:
-                return jsonify({
+                return _json_response({
                     'status': 'error',
                     'message': message
-                }), 400
+                }, 400)
                 
         elif command == 'api':
             # Update API keys
@@ -278,32 +451,32 @@ def handle_command():
             api_secret = data.get('secret', '')
             
             if not api_key or not api_secret:
-                return jsonify({
+                return _json_response({
                     'status': 'error',
                     'message': 'API key and secret are required'
-                }), 400
+                }, 400)
             
             # Update the config
             strategy.update_api_keys(api_key, api_secret)
             update_status_file()
             
-            return jsonify({
+            return _json_response({
                 'status': 'success',
                 'message': 'API keys updated'
             })
             
         else:
-            return jsonify({
+            return _json_response({
                 'status': 'error',
                 'message': f'Unknown command: {command}'
-            }), 400
+            }, 400)
             
     except Exception as e:
         logger.error(f'Error handling command: {e}')
-        return jsonify({
+        return _json_response({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }, 500)
 
 def attempt_to_recover_api_keys():
     """Attempt to recover API keys from backup locations if they're missing."""
@@ -340,43 +513,58 @@ def attempt_to_recover_api_keys():
         logger.error(f'Error attempting to recover API keys: {e}')
         return False
 
+# Try key recovery once at import so the start command only checks the
+# cached flag instead of re-reading env vars and the backup file every time
+if not strategy._api_keys_configured:
+    attempt_to_recover_api_keys()
+strategy._recovery_attempted = True
+
 @paper_trading_bp.route('/api-status', methods=['GET'])
 def get_api_status():
     """Get the API keys configuration status"""
     try:
-        api_key = strategy.config.get('api_key', '')
-        api_secret = strategy.config.get('api_secret', '')
-        
-        # Test the API connection if keys are configured
+        keys_configured = strategy._api_keys_configured
+
+        # Test the API connection if keys are configured; the strategy caches
+        # the result so this does not ping Binance on every request
         api_working = False
-        if api_key and api_secret:
-            try:
-                # Quick test of API connection
-                strategy.test_api_connection()
-                api_working = True
-            except Exception as e:
-                logger.error(f'API connection test failed: {e}')
-        
-        return jsonify({
+        if keys_configured:
+            api_working = strategy.test_api_connection()
+
+        return _json_response({
             'status': 'success',
             'data': {
-                'keys_configured': bool(api_key) and bool(api_secret),
+                'keys_configured': keys_configured,
                 'api_working': api_working
             }
         })
     except Exception as e:
         logger.error(f'Error getting API status: {e}')
-        return jsonify({
+        return _json_response({
             'status': 'error',
             'message': str(e)
-        }), 500
+        }, 500)
 
 # Serve static files from the data directory
 @paper_trading_bp.route('/paper_trading_status.json', methods=['GET'])
 def serve_status_file():
     """Serve the status JSON file"""
     update_status_file()  # Update before serving
-    return send_from_directory(data_dir, 'paper_trading_status.json')
+
+    # The update swallows its own errors, so the file may still be missing
+    if not os.path.exists(status_file):
+        return _json_response({
+            'status': 'error',
+            'message': 'Status file not available'
+        }, 404)
+
+    # Serve conditionally so a polling frontend gets a 304 instead of the
+    # full body whenever the file has not changed since its last fetch
+    mtime = os.path.getmtime(status_file)
+    response = send_file(status_file, mimetype='application/json', last_modified=mtime)
+    response.set_etag(f'{strategy._state_version}-{int(mtime)}')
+    response.cache_control.max_age = 1
+    return response.make_conditional(request)
 
 def init_app(app):
     """Initialize the Flask app with the paper trading blueprint"""
@@ -392,9 +580,17 @@ def init_app(app):
         return send_from_directory(data_dir, filename)
 
 
-if __name__ == "__main__":
-    # This can be run as a standalone service for testing
+def create_app():
+    """Application factory for gunicorn and the standalone entry point"""
     app = Flask(__name__)
     init_app(app)
+    return app
+
+
+if __name__ == "__main__":
+    # Development fallback only; production runs under gunicorn with gevent
+    # workers (see gunicorn_conf.py) so requests are not serialized behind a
+    # single thread waiting on Binance round-trips
+    app = create_app()
     logger.info('Starting Paper Trading API server on port 5001')
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    app.run(host='0.0.0.0', port=5001)
@@ -0,0 +1,27 @@
+"""
+Gunicorn configuration for the paper trading API.
+
+The Flask development server handles one request at a time and carries
+debug overhead; gevent workers let each worker serve many connections
+while Binance round-trips are in flight.
+
+Run with:
+    gunicorn -c gunicorn_conf.py 'api:create_app()'
+"""
+
+bind = '0.0.0.0:5001'
+worker_class = 'gevent'
+
+# All account state (balance, holdings, state version) lives in the worker
+# process, so multiple workers would each trade against their own account
+# and the status file would flip-flop between them. One gevent worker still
+# serves many concurrent connections via greenlets; raise this only once
+# the strategy state is shared across processes.
+workers = 1
+
+# The app must be imported after the gevent worker monkey-patches: importing
+# in the master (preload) would create the log QueueListener threads and the
+# strategy's locks/conditions on real OS threads that don't survive the fork.
+preload_app = False
+
+timeout = 60
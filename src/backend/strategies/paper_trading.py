@@ -2,24 +2,105 @@ import os
 import json
 import time
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 import pandas as pd
 import numpy as np
+from collections import deque
 from datetime import datetime, timedelta
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from binance.enums import *
 import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Use orjson for config serialization when available (much faster than stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dump_json_bytes(obj):
+    """Serialize an object to indented JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+def _load_json_bytes(buf):
+    """Deserialize JSON bytes"""
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(buf)
+
+# Optional numba JIT for the trade-history reducers; long-running sessions
+# accumulate thousands of trades, and the compiled scans remove the remaining
+# per-call numpy dispatch overhead from the status hot path
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _win_rate(pnl, side, n):
+        wins = 0
+        closed = 0
+        for i in range(n):
+            if side[i] == 1:
+                closed += 1
+                if pnl[i] > 0:
+                    wins += 1
+        return (wins / closed) * 100 if closed else 0.0
+
+    @njit(cache=True)
+    def _profit_loss(pnl, n):
+        total = 0.0
+        for i in range(n):
+            total += pnl[i]
+        return total
+else:
+    def _win_rate(pnl, side, n):
+        sells = side[:n] == 1
+        closed = int(sells.sum())
+        if not closed:
+            return 0.0
+        wins = int((pnl[:n][sells] > 0).sum())
+        return (wins / closed) * 100
+
+    def _profit_loss(pnl, n):
+        return float(pnl[:n].sum())
+
+# Cached ISO timestamp, rebuilt at most once per second since formatting a
+# datetime is surprisingly expensive on hot paths
+_ts_cache = [0, '']
+
+def now_iso():
+    """Return the current local time as an ISO string at second resolution"""
+    key = int(time.time())
+    cache = _ts_cache
+    if cache[0] != key:
+        cache[0] = key
+        cache[1] = datetime.fromtimestamp(key).isoformat()
+    return cache[1]
 
 # Configure logging
 log_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../logs'))
 os.makedirs(log_dir, exist_ok=True)
 log_file = os.path.join(log_dir, 'paper_trading.log')
 
+# File writes happen on a background listener thread, so the trading loop
+# only pays for a queue put instead of a locked disk write per log call
+_log_queue = queue.SimpleQueue()
+_file_handler = logging.FileHandler(log_file)
+_file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = QueueListener(_log_queue, _file_handler, respect_handler_level=True)
+_log_listener.start()
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler(log_file),
+        QueueHandler(_log_queue),
         logging.StreamHandler()
     ]
 )
@@ -30,6 +111,18 @@ class PaperTradingStrategy:
     Paper trading strategy for Binance that can be easily switched to live trading.
     This class simulates trading with virtual funds while using real market data.
     """
+
+    # Simulated fallback prices as symbol -> (base, span, offset), used for
+    # development without API access
+    _SIM_BASE = {
+        'BTCUSDT': (46700, 100, -50),
+        'ETHUSDT': (3220, 20, -10),
+        'ADAUSDT': (0.35, 0.01, -0.005),
+        'SOLUSDT': (142, 3, -1.5),
+        'DOTUSDT': (7.5, 0.2, -0.1),
+        'XRPUSDT': (0.53, 0.01, -0.005)
+    }
+
     def __init__(self, config_file='trading_config.json'):
         """
         Initialize the paper trading strategy with configuration.
@@ -39,23 +132,43 @@ class PaperTradingStrategy:
         """
         self.config_file = config_file
         self.load_config()
-        
+
+        # Incremented whenever account state changes so status writers can
+        # skip redundant serialization when nothing is new; the condition
+        # lets push consumers (SSE) sleep until the next change
+        self._state_version = 0
+        self._state_changed = threading.Condition()
+
         # Initialize account state
         self.reset_account()
         
         # Initialize runtime variables
         self.is_running = False
         self.thread = None
-        self.orders = []
-        
+
         # Keep API key state at startup
         self._last_api_key = self.config.get('api_key', '')
         self._last_api_secret = self.config.get('api_secret', '')
-        self.trade_history = []
-        
-        # Initialize prices dictionary
-        self.last_prices = {}
+
+        # Full ticker map from the last batched refresh; kept private so the
+        # serialized status only carries the published last_prices subset
+        self._ticker_cache = {}
+        self._ticker_cache_ts = 0
+
+        # Pre-generated noise for simulated prices, consumed index by index
+        # so the fallback path avoids a numpy RNG call per lookup
+        self._noise = np.random.random(65536)
+        self._noise_i = 0
+
+        # Small thread pool for fetching several ticker prices concurrently
+        self._price_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='price')
         
+        # Cached API connectivity check as (result, deadline)
+        self._api_ok_cached = (False, 0.0)
+
+        # Whether key recovery (env vars / backup file) has already been tried
+        self._recovery_attempted = False
+
         # Create client if API keys are configured
         self.client = None
         if self.config.get('api_key') and self.config.get('api_secret'):
@@ -65,22 +178,31 @@ class PaperTradingStrategy:
         """Load the configuration from the JSON file"""
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    self.config = json.load(f)
+                with open(self.config_file, 'rb') as f:
+                    self.config = _load_json_bytes(f.read())
                 logger.info(f'Loaded configuration from {self.config_file}')
             else:
                 logger.warning(f'Config file not found: {self.config_file}')
                 self.config = self.get_default_config()
-                
+
                 # Create the config file with default values
                 os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
-                with open(self.config_file, 'w') as f:
-                    json.dump(self.config, f, indent=2)
+                with open(self.config_file, 'wb') as f:
+                    f.write(_dump_json_bytes(self.config))
                 logger.info(f'Created default config file: {self.config_file}')
         except Exception as e:
             logger.error(f'Error loading config: {e}')
             self.config = self.get_default_config()
-        
+
+        self._freeze_config()
+
+    def _freeze_config(self):
+        """Cache hot config values as attributes so request paths skip dict lookups"""
+        self.mode = self.config.get('mode', 'paper')
+        self.base_currency = self.config.get('base_currency', 'USDT')
+        self.max_history_items = self.config.get('max_history_items', 100)
+        self._api_keys_configured = bool(self.config.get('api_key')) and bool(self.config.get('api_secret'))
+
     def get_default_config(self):
         """Return default configuration values"""
         return {
@@ -120,8 +242,8 @@ class PaperTradingStrategy:
     def save_config(self):
         """Save the current configuration to the JSON file"""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            with open(self.config_file, 'wb') as f:
+                f.write(_dump_json_bytes(self.config))
             logger.info(f'Saved configuration to {self.config_file}')
         except Exception as e:
             logger.error(f'Error saving config: {e}')
@@ -131,16 +253,56 @@ class PaperTradingStrategy:
         self.balance = self.config.get('balance', 10000)
         self.initial_balance = self.balance
         self.holdings = {}
+        self.cost_basis = {}
+
+        # Portfolio value maintained on trades and price refreshes so request
+        # handlers read it in O(1) instead of revaluing every holding
+        self._portfolio_value = self.balance
         self.trades = []
-        self.trade_history = []
+
+        # Bounded to the last N entries so the status file's "recent trades"
+        # view is simply the whole deque, with no per-refresh slicing and no
+        # unbounded memory growth; _total_trades keeps the lifetime count
+        self.trade_history = deque(maxlen=self.max_history_items)
+        self._total_trades = 0
+
+        # Numeric trade fields stored struct-of-arrays style (one numpy
+        # column per field, grown by doubling) so the calculate_* helpers
+        # can run as vectorized scans instead of per-dict Python loops
+        self._th = {
+            'quantity': np.empty(1024),
+            'price': np.empty(1024),
+            'value': np.empty(1024),
+            'balance_after': np.empty(1024),
+            'pnl': np.empty(1024),
+            'side': np.empty(1024, dtype=np.int8)  # 0 = buy, 1 = sell
+        }
+        self._th_len = 0
+
+        # Balance history as a pre-allocated numpy array so Sharpe ratio and
+        # max drawdown reduce in C instead of looping in Python
+        self._bal = np.empty(4096)
+        self._bal[0] = self.balance
+        self._bal_n = 1
+
+        # Cached realized pnl, keyed by state version
+        self._pnl_cache = (-1, 0)
+
         self.orders = []
         self.open_orders = []
         self.last_prices = {}
         self.performance_data = {
-            'balance_history': [(datetime.now().isoformat(), self.balance)],
+            'balance_history': [(now_iso(), self.balance)],
             'trades': []
         }
-        logger.info(f'Reset account with balance {self.balance} {self.config.get("base_currency", "USDT")}')
+        self._bump_state_version()
+        logger.info(f'Reset account with balance {self.balance} {self.base_currency}')
+
+    def _bump_state_version(self):
+        """Mark the account state as changed so cached status output is invalidated"""
+        self._state_version += 1
+        with self._state_changed:
+            self._state_changed.notify_all()
     
     def create_client(self):
         """Create the Binance API client if keys are configured"""
@@ -161,32 +323,40 @@ class PaperTradingStrategy:
             self.client = None
     
     def test_api_connection(self):
-        """Test the Binance API connection"""
+        """Test the Binance API connection (result is cached for 30 seconds)"""
+        ok, deadline = self._api_ok_cached
+        if time.monotonic() < deadline:
+            return ok
+
         if not self.client:
             self.create_client()
-        
+
+        ok = False
         if self.client:
             try:
                 self.client.ping()
                 server_time = self.client.get_server_time()
                 logger.info(f'API connection successful. Server time: {server_time}')
-                return True
+                ok = True
             except Exception as e:
                 logger.error(f'API connection test failed: {e}')
-                return False
         else:
             logger.warning('No API client available to test connection')
-            return False
+
+        self._api_ok_cached = (ok, time.monotonic() + 30)
+        return ok
     
     def api_keys_configured(self):
         """Check if API keys are configured"""
-        return (self.config.get('api_key') and self.config.get('api_secret'))
+        return self._api_keys_configured
     
     def update_api_keys(self, api_key, api_secret):
         """Update the API keys in the configuration"""
         self.config['api_key'] = api_key
         self.config['api_secret'] = api_secret
-        
+        self._freeze_config()
+        self._api_ok_cached = (False, 0.0)
+
         # Save API keys to backup file for recovery if needed
         backup_dir = os.path.dirname(self.config_file)
         backup_file = os.path.join(backup_dir, 'api_keys_backup.json')
@@ -202,9 +372,10 @@ class PaperTradingStrategy:
         
         # Re-create the client with new keys
         self.create_client()
-        
+
         # Save the updated config
         self.save_config()
+        self._bump_state_version()
         logger.info('Updated API keys')
     
     def get_current_price(self, symbol):
@@ -213,39 +384,288 @@ class PaperTradingStrategy:
         Tries to use the Binance API if available, otherwise uses cached values.
         """
         try:
-            # If we have a client, try to get a real-time price
+            # Serve from the batched ticker cache while it is still fresh
+            if symbol in self._ticker_cache and time.time() - self._ticker_cache_ts < 5:
+                return self._ticker_cache[symbol]
+
+            # If we have a client, refresh all prices with one batched call
             if self.client:
-                ticker = self.client.get_symbol_ticker(symbol=symbol)
-                price = float(ticker['price'])
-                self.last_prices[symbol] = price
-                return price
-            
+                self.refresh_all_tickers()
+                if symbol in self._ticker_cache:
+                    return self._ticker_cache[symbol]
+
             # If no client or API call fails, use the last known price
             if symbol in self.last_prices:
                 return self.last_prices[symbol]
             
             # If we don't have a price, simulate one (for development without API)
             # This is just a placeholder, real implementations should use actual market data
-            if symbol == 'BTCUSDT':
-                return 46700 + (np.random.random() * 100 - 50)
-            elif symbol == 'ETHUSDT':
-                return 3220 + (np.random.random() * 20 - 10)
-            elif symbol == 'ADAUSDT':
-                return 0.35 + (np.random.random() * 0.01 - 0.005)
-            elif symbol == 'SOLUSDT':
-                return 142 + (np.random.random() * 3 - 1.5)
-            elif symbol == 'DOTUSDT':
-                return 7.5 + (np.random.random() * 0.2 - 0.1)
-            elif symbol == 'XRPUSDT':
-                return 0.53 + (np.random.random() * 0.01 - 0.005)
-            else:
-                return 100  # Default price for unknown symbols
+            base, span, offset = self._SIM_BASE.get(symbol, (100, 0, 0))
+            self._noise_i = (self._noise_i + 1) & 65535
+            return base + self._noise[self._noise_i] * span + offset
             
         except Exception as e:
             logger.error(f'Error getting price for {symbol}: {e}')
-            
+
             # Return last known price if available
             if symbol in self.last_prices:
                 return self.last_prices[symbol]
-            
+
             return None
+
+    def refresh_all_tickers(self):
+        """
+        Refresh the cached prices with a single batched API call.
+
+        One get_all_tickers round-trip replaces a per-symbol request for
+        every holding; the result is cached for 5 seconds.
+        """
+        if not self.client:
+            return
+
+        if time.time() - self._ticker_cache_ts < 5:
+            return
+
+        try:
+            tickers = self.client.get_all_tickers()
+            self._ticker_cache = {t['symbol']: float(t['price']) for t in tickers}
+
+            # Publish only the configured symbols and current holdings; the
+            # full ~3000-symbol map would bloat every serialized status
+            # payload the frontend receives
+            watched = set(self.config.get('symbols', [])) | set(self.holdings)
+            self.last_prices = {s: self._ticker_cache[s] for s in watched if s in self._ticker_cache}
+
+            self._ticker_cache_ts = time.time()
+            self._recompute_portfolio_value()
+        except Exception as e:
+            logger.error(f'Error refreshing tickers: {e}')
+
+    def _recompute_portfolio_value(self):
+        """Revalue the portfolio; prices come from the already-fresh cache"""
+        total = self.balance
+        for symbol, amount in self.holdings.items():
+            price = self.last_prices.get(symbol) or self.get_current_price(symbol)
+            if price:
+                total += amount * price
+        self._portfolio_value = total
+
+    def fetch_prices(self, symbols):
+        """
+        Fetch current prices for several symbols concurrently.
+
+        Each Binance ticker request is a blocking HTTP round-trip; fanning
+        them out over the thread pool collapses N sequential round-trips
+        into roughly one.
+
+        Returns:
+            dict: symbol -> price (None for symbols that could not be priced)
+        """
+        symbols = list(symbols)
+        if len(symbols) <= 1:
+            return {symbol: self.get_current_price(symbol) for symbol in symbols}
+
+        prices = self._price_pool.map(self.get_current_price, symbols)
+        return dict(zip(symbols, prices))
+
+    def start(self):
+        """Start the trading loop in a background thread"""
+        if self.is_running:
+            logger.warning('Trading loop already running')
+            return
+
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+        self._bump_state_version()
+        logger.info('Paper trading started')
+
+    def stop(self):
+        """Stop the trading loop"""
+        if not self.is_running:
+            logger.warning('Trading loop is not running')
+            return
+
+        self.is_running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=10)
+        self.thread = None
+        self._bump_state_version()
+        logger.info('Paper trading stopped')
+
+    def _run_loop(self):
+        """Background loop that keeps prices fresh while trading is running"""
+        while self.is_running:
+            try:
+                for symbol in self.config.get('symbols', []):
+                    self.get_current_price(symbol)
+            except Exception as e:
+                logger.error(f'Error in trading loop: {e}')
+            time.sleep(5)
+
+    def place_buy_order(self, symbol, quantity):
+        """
+        Place a simulated market buy order.
+
+        Returns:
+            tuple: (success, message)
+        """
+        try:
+            # Reject bad quantities before touching balance or holdings: a
+            # negative value would credit the account and zero would poison
+            # the cost basis with a division by zero
+            if not np.isfinite(quantity) or quantity <= 0:
+                return False, f'Invalid quantity: {quantity}'
+
+            price = self.get_current_price(symbol)
+            if not price:
+                return False, f'Could not get price for {symbol}'
+
+            value = quantity * price
+            if value > self.balance:
+                return False, f'Insufficient balance for {symbol}: need {value:.2f}, have {self.balance:.2f}'
+
+            self.balance -= value
+            held = self.holdings.get(symbol, 0)
+
+            # Track average cost so sells can report realized profit/loss
+            previous_cost = self.cost_basis.get(symbol, 0) * held
+            self.holdings[symbol] = held + quantity
+            self.cost_basis[symbol] = (previous_cost + value) / self.holdings[symbol]
+
+            self._record_trade(symbol, 'buy', quantity, price, value)
+            return True, f'Bought {quantity} {symbol} at {price}'
+
+        except Exception as e:
+            logger.error(f'Error placing buy order for {symbol}: {e}')
+            return False, str(e)
+
+    def place_sell_order(self, symbol, quantity):
+        """
+        Place a simulated market sell order.
+
+        Returns:
+            tuple: (success, message)
+        """
+        try:
+            # Reject bad quantities before touching balance or holdings: a
+            # negative value would mint holdings out of thin air
+            if not np.isfinite(quantity) or quantity <= 0:
+                return False, f'Invalid quantity: {quantity}'
+
+            held = self.holdings.get(symbol, 0)
+            if quantity > held:
+                return False, f'Insufficient holdings for {symbol}: need {quantity}, have {held}'
+
+            price = self.get_current_price(symbol)
+            if not price:
+                return False, f'Could not get price for {symbol}'
+
+            value = quantity * price
+            pnl = (price - self.cost_basis.get(symbol, price)) * quantity
+
+            self.balance += value
+            remaining = held - quantity
+            if remaining > 1e-12:
+                self.holdings[symbol] = remaining
+            else:
+                del self.holdings[symbol]
+                self.cost_basis.pop(symbol, None)
+
+            self._record_trade(symbol, 'sell', quantity, price, value, pnl)
+            return True, f'Sold {quantity} {symbol} at {price}'
+
+        except Exception as e:
+            logger.error(f'Error placing sell order for {symbol}: {e}')
+            return False, str(e)
+
+    def _record_trade(self, symbol, side, quantity, price, value, pnl=0.0):
+        """Record an executed trade in the trade history"""
+        trade = {
+            'timestamp': now_iso(),
+            'symbol': symbol,
+            'side': side,
+            'quantity': quantity,
+            'price': price,
+            'value': value,
+            'balance_after': self.balance,
+            'type': 'market',
+            'pnl': pnl
+        }
+        self.trade_history.append(trade)
+        self._total_trades += 1
+
+        # Append the numeric fields to the struct-of-arrays columns
+        n = self._th_len
+        if n == len(self._th['value']):
+            for key, column in self._th.items():
+                self._th[key] = np.resize(column, n * 2)
+        self._th['quantity'][n] = quantity
+        self._th['price'][n] = price
+        self._th['value'][n] = value
+        self._th['balance_after'][n] = self.balance
+        self._th['pnl'][n] = pnl
+        self._th['side'][n] = 1 if side == 'sell' else 0
+        self._th_len = n + 1
+
+        if self._bal_n == len(self._bal):
+            self._bal = np.resize(self._bal, self._bal_n * 2)
+        self._bal[self._bal_n] = self.balance
+        self._bal_n += 1
+
+        self.performance_data['balance_history'].append((trade['timestamp'], self.balance))
+        self.performance_data['trades'].append(trade)
+        self._recompute_portfolio_value()
+        self._bump_state_version()
+        logger.info(f'{side.upper()} {quantity} {symbol} at {price}')
+
+    def calculate_portfolio_value(self):
+        """Return the total portfolio value (balance plus holdings at current prices)"""
+        return self._portfolio_value
+
+    def calculate_win_rate(self):
+        """Calculate the percentage of closed (sell) trades that were profitable"""
+        n = self._th_len
+        if not n:
+            return 0
+        return _win_rate(self._th['pnl'], self._th['side'], n)
+
+    def calculate_profit_loss(self):
+        """Calculate the realized profit/loss over all closed trades"""
+        if self._pnl_cache[0] == self._state_version:
+            return self._pnl_cache[1]
+
+        n = self._th_len
+        # pnl is zero for buys, so no mask is needed
+        profit = _profit_loss(self._th['pnl'], n) if n else 0
+
+        self._pnl_cache = (self._state_version, profit)
+        return profit
+
+    def calculate_sharpe_ratio(self):
+        """Calculate the annualized Sharpe ratio from the balance history"""
+        if self._bal_n < 2:
+            return 0
+
+        balances = self._bal[:self._bal_n]
+        previous = balances[:-1]
+        mask = previous > 0
+        if not mask.any():
+            return 0
+
+        returns = np.diff(balances)[mask] / previous[mask]
+        std = returns.std()
+        if std == 0:
+            return 0
+
+        return float(returns.mean() / std * np.sqrt(252))
+
+    def calculate_max_drawdown(self):
+        """Calculate the maximum drawdown (as a fraction) of the balance history"""
+        if self._bal_n < 2:
+            return 0
+
+        balances = self._bal[:self._bal_n]
+        peaks = np.maximum.accumulate(balances)
+        drawdowns = (peaks - balances) / np.where(peaks > 0, peaks, 1)
+        return float(drawdowns.max())